@@ -1,12 +1,16 @@
 from textual.app import App, ComposeResult
+from textual.binding import Binding
 from textual.widgets import Header, Button, Static, DataTable, Input, LoadingIndicator
 from textual.containers import Container, Horizontal, VerticalScroll
 from rich.text import Text
 from css import CSS as styles
-from database_conn import establish_connection, get_table_names, get_table_data, get_database_schema
+from database_conn import establish_connection, open_connection, get_table_names, get_table_data, get_database_schema, execute_query, get_storage_report
 from bedrock import Bedrock
 import sys
+import os
 import json
+import time
+import sqlite3
 
 
 class DatabaseUI(App):
@@ -20,16 +24,38 @@ class DatabaseUI(App):
         ("t", "toggle_mode", "Toggle Mode"),
         ("y", "confirm_commit", "Confirm Changes"),
         ("n", "cancel_commit", "Cancel Changes"),
+        ("s", "storage", "Storage"),
+        ("v", "vacuum", "VACUUM"),
+        ("i", "vacuum_into", "VACUUM INTO"),
+        ("o", "optimize", "Optimize"),
+        ("a", "analyze", "ANALYZE"),
+        ("c", "cancel_maintenance", "Cancel Maintenance"),
+        # Runs before DataTable's own ctrl+end so the real last row is loaded first
+        Binding("ctrl+end", "table_bottom", "Bottom", show=False, priority=True),
     ]
 
+    ROW_CHUNK = 500  # Rows added to the grid at a time when viewing table data
+
+    MAINTENANCE_ACTIONS = {
+        "vacuum": ("VACUUM", "VACUUM"),
+        "vacuum_into": ("VACUUM INTO", "VACUUM INTO ?"),
+        "optimize": ("PRAGMA optimize", "PRAGMA optimize"),
+        "analyze": ("ANALYZE", "ANALYZE"),
+    }
+
     def __init__(self):
         super().__init__()
-        self.view_state = "table_list"  # or "table_data"
+        self.view_state = "table_list"  # or "table_data" or "storage"
         self.selected_table = None
         self.current_columns = []  # Store column names when viewing table data
+        self.current_values = []  # Typed values per column when viewing table data
+        self.loaded_rows = 0  # Number of buffered rows added to the grid so far
         self.input_mode = "SQL"  # "AI" or "SQL"
         self.bedrock = None  # Will be initialized when switching to AI mode
         self.pending_commit = False  # Track if there's a pending commit
+        self.storage_objects = []  # Per table/index stats shown in storage view
+        self.maintenance_conn = None  # Connection used by a running maintenance task
+        self.view_changes = 0  # Bumped on navigation so stale background results are dropped
 
     def compose(self) -> ComposeResult:
         """Create child widgets for the app."""
@@ -61,6 +87,9 @@ class DatabaseUI(App):
         # Hide loading indicator initially
         self.query_one("#loading", LoadingIndicator).display = False
 
+        # Add more buffered rows when scrolling near the end of the table
+        self.watch(table, "scroll_y", self._on_table_scroll)
+
         # Disable focus on widgets we don't want in tab navigation
         self.query_one(Header).can_focus = False
         self.query_one("#title", Static).can_focus = False
@@ -82,12 +111,14 @@ class DatabaseUI(App):
             "• Click tab to switch widgets\n"
             "• Press 'b' to go back\n"
             "• Press 't' to switch modes\n"
+            "• Press 's' for storage report\n"
             "• Press 'q' to quit\n"
             "• Ask anything in the text input\n"
             "  for AI assistance"
         ))
 
-        self.db_conn = establish_connection(sys.argv[1])
+        self.db_path = sys.argv[1]
+        self.db_conn = establish_connection(self.db_path)
         self.tables_names = get_table_names(self.db_conn)
 
         table.add_columns("Table Name", "Rows")
@@ -104,8 +135,10 @@ class DatabaseUI(App):
         table = self.query_one("#data-table", DataTable)
         welcome = self.query_one("#welcome-box", Static)
 
-        # Clear the table
+        # Clear the table and release the buffers of the last opened table
         table.clear(columns=True)
+        self.current_values = []
+        self.loaded_rows = 0
 
         # Reset to table list view
         table.add_columns("Table Name", "Rows")
@@ -122,6 +155,7 @@ class DatabaseUI(App):
             "• Press tab to switch widgets\n"
             "• Press 'b' to go back\n"
             "• Press 't' to switch modes\n"
+            "• Press 's' for storage report\n"
             "• Press 'q' to quit\n"
             "• Ask anything in the text input\n"
             "  for AI assistance"
@@ -129,17 +163,24 @@ class DatabaseUI(App):
 
         # Update state
         self.view_state = "table_list"
+        self.view_changes += 1
 
     def show_table_data(self, table_name: str) -> None:
         """Display data from selected table"""
         table = self.query_one("#data-table", DataTable)
         welcome = self.query_one("#welcome-box", Static)
 
-        # Get table data
-        columns, rows = get_table_data(self.db_conn, table_name)
+        # Get table data, VACUUM can hold the database lock for a while
+        try:
+            columns, column_values = get_table_data(self.db_conn, table_name)
+        except sqlite3.OperationalError as e:
+            self.notify(f"Could not open {table_name}: {str(e)}", severity="error")
+            return
 
-        # Store columns for row selection
+        # Keep typed values for row details, only a window of them is rendered
         self.current_columns = columns
+        self.current_values = column_values
+        self.loaded_rows = 0
 
         # Clear the table
         table.clear(columns=True)
@@ -147,29 +188,73 @@ class DatabaseUI(App):
         # Add columns from the selected table
         table.add_columns(*columns)
 
-        # Add rows
-        for row in rows:
-            # Convert row to strings for display
-            table.add_row(*[str(val) for val in row])
+        # Add the first chunk of rows, the rest are added while scrolling
+        self.load_more_rows()
 
         # Update welcome box with viewing message
         welcome.remove_class("left-align")
-        welcome.update(Text(f"Viewing: {table_name}\n\nPress 'b' to go back"))
+        row_count = len(column_values[0]) if column_values else 0
+        welcome.update(Text(f"Viewing: {table_name}\n{row_count} row(s)\n\nPress ctrl+end to jump to the last row\nPress 'b' to go back"))
 
         # Update state
         self.view_state = "table_data"
         self.selected_table = table_name
+        self.view_changes += 1
+
+    def load_more_rows(self, all_rows: bool = False) -> None:
+        """Add the next chunk of buffered rows, or all remaining rows, to the grid"""
+        table = self.query_one("#data-table", DataTable)
+        total = len(self.current_values[0]) if self.current_values else 0
+
+        while self.loaded_rows < total:
+            start = self.loaded_rows
+            end = min(start + self.ROW_CHUNK, total)
+
+            # The grid shares the typed values rather than holding string copies.
+            # Its formatter matches str() except for REAL, which it rounds to
+            # 2 places, and NULL, which it leaves blank, so only those change
+            columns = []
+            for values in self.current_values:
+                column = values[start:end]
+                if any(val is None or type(val) is float for val in column):
+                    column = ["None" if val is None else str(val) if type(val) is float else val for val in column]
+                columns.append(column)
+            table.add_rows(zip(*columns))
+            self.loaded_rows = end
+
+            if not all_rows:
+                break
+
+    def check_action(self, action: str, parameters: tuple) -> bool | None:
+        """Only take ctrl+end from the grid while it is showing table data"""
+        if action == "table_bottom":
+            return self.view_state == "table_data" and isinstance(self.focused, DataTable)
+        return True
+
+    def action_table_bottom(self) -> None:
+        """Load every remaining row and move to the last one (ctrl+end)"""
+        self.load_more_rows(all_rows=True)
+        self.query_one("#data-table", DataTable).action_scroll_bottom()
+
+    def _on_table_scroll(self, scroll_y: float) -> None:
+        """Load more rows once the table is scrolled close to the bottom"""
+        table = self.query_one("#data-table", DataTable)
+        if self.view_state == "table_data" and scroll_y >= table.max_scroll_y - table.size.height:
+            self.load_more_rows()
+
+    def on_data_table_row_highlighted(self, event: DataTable.RowHighlighted) -> None:
+        """Load more rows when the cursor gets close to the last loaded row"""
+        if self.view_state == "table_data" and event.cursor_row >= self.loaded_rows - 50:
+            self.load_more_rows()
 
     def show_row_details(self, event: DataTable.RowSelected) -> None:
         """Display selected row as formatted JSON in welcome box"""
-        table = event.data_table
         row_index = event.cursor_row
 
-        row = table.get_row_at(row_index)
-
+        # Use the original typed values rather than the displayed strings
         row_dict = {}
-        for i, col_name in enumerate(self.current_columns):
-            row_dict[col_name] = row[i]
+        for col_name, values in zip(self.current_columns, self.current_values):
+            row_dict[col_name] = values[row_index]
 
         # Format as pretty JSON
         json_str = json.dumps(row_dict, indent=2, default=str)
@@ -181,9 +266,178 @@ class DatabaseUI(App):
 
     def action_back(self) -> None:
         """Handle back action (b key)"""
-        if self.view_state == "table_data":
+        if self.view_state in ("table_data", "storage"):
             self.show_table_list()
 
+    def action_storage(self) -> None:
+        """Open the storage report (s key)"""
+        self.query_one("#loading", LoadingIndicator).display = True
+        view_changes = self.view_changes
+        self.run_worker(lambda: self._load_storage_report(view_changes), exclusive=False, thread=True)
+
+    def _load_storage_report(self, view_changes: int) -> None:
+        """Scan dbstat in background, it reads every page of the database"""
+        try:
+            conn = open_connection(self.db_path, read_only=True)
+            try:
+                summary, objects = get_storage_report(conn)
+            finally:
+                conn.close()
+            self.call_from_thread(self.show_storage_report, summary, objects, view_changes)
+        except Exception as e:
+            self.call_from_thread(self.notify, f"Storage report failed: {str(e)}", severity="error")
+        finally:
+            self.call_from_thread(self._hide_loading)
+
+    def _hide_loading(self) -> None:
+        self.query_one("#loading", LoadingIndicator).display = False
+
+    def show_storage_report(self, summary: dict, objects: list, view_changes: int) -> None:
+        """Display per table and index storage statistics"""
+        # The user navigated elsewhere while the report was being built
+        if view_changes != self.view_changes:
+            return
+
+        table = self.query_one("#data-table", DataTable)
+        welcome = self.query_one("#welcome-box", Static)
+
+        self.storage_objects = objects
+
+        table.clear(columns=True)
+        self.current_values = []
+        self.loaded_rows = 0
+        table.add_columns("Name", "Type", "Size", "Pages", "Overflow", "Rows", "Avg Payload", "Unused %", "Frag %")
+        for stats in objects:
+            table.add_row(
+                stats["name"],
+                stats["type"],
+                _format_bytes(stats["size"]),
+                str(stats["pages"]),
+                str(stats["overflow_pages"]),
+                str(stats["rows"]),
+                _format_bytes(stats["avg_payload"]),
+                f"{stats['unused_percent']:.1f}",
+                f"{stats['fragmentation_percent']:.1f}",
+            )
+
+        welcome.add_class("left-align")
+        welcome.update(Text(
+            "Storage Report\n\n"
+            f"File size: {_format_bytes(summary['file_size'])}\n"
+            f"Page size: {summary['page_size']} bytes\n"
+            f"Pages: {summary['page_count']}\n"
+            f"Free pages: {summary['freelist_count']} ({summary['free_percent']:.1f}%)\n\n"
+            "Maintenance:\n"
+            "• Press 'v' to VACUUM\n"
+            "• Press 'i' to VACUUM INTO a copy\n"
+            "• Press 'o' to PRAGMA optimize\n"
+            "• Press 'a' to ANALYZE\n"
+            "• Press 'c' to cancel a running task\n"
+            "• Press 'b' to go back"
+        ))
+
+        self.view_state = "storage"
+
+    def action_vacuum(self) -> None:
+        """Rebuild the database file (v key)"""
+        self.start_maintenance("vacuum")
+
+    def action_vacuum_into(self) -> None:
+        """Write a vacuumed copy next to the database (i key)"""
+        root, ext = os.path.splitext(self.db_path)
+        self.start_maintenance("vacuum_into", (f"{root}-vacuum-{time.strftime('%Y%m%d-%H%M%S')}{ext}",))
+
+    def action_optimize(self) -> None:
+        """Run PRAGMA optimize (o key)"""
+        self.start_maintenance("optimize")
+
+    def action_analyze(self) -> None:
+        """Refresh query planner statistics (a key)"""
+        self.start_maintenance("analyze")
+
+    def action_cancel_maintenance(self) -> None:
+        """Interrupt the running maintenance task (c key)"""
+        conn = self.maintenance_conn
+        if conn:
+            try:
+                # interrupt() is safe to call from another thread
+                conn.interrupt()
+            except sqlite3.ProgrammingError:
+                # The task finished and closed its connection in the meantime
+                return
+            self.notify("Cancel requested, stopping at the next interruptible step", severity="warning")
+
+    def start_maintenance(self, action: str, params: tuple = ()) -> None:
+        """Run a maintenance statement on a background worker"""
+        if self.view_state != "storage":
+            return
+        if self.maintenance_conn:
+            self.notify("A maintenance task is already running", severity="warning")
+            return
+        if self.pending_commit:
+            self.notify("Commit or cancel pending changes first", severity="warning")
+            return
+
+        label, sql = self.MAINTENANCE_ACTIONS[action]
+        self.maintenance_conn = open_connection(self.db_path, check_same_thread=False)
+        self.query_one("#loading", LoadingIndicator).display = True
+        self.query_one("#generated-sql", Static).update(f"{label} running... press 'c' to cancel")
+        self.run_worker(lambda: self._run_maintenance(label, sql, params), exclusive=False, thread=True)
+
+    def _run_maintenance(self, label: str, sql: str, params: tuple) -> None:
+        """Execute maintenance in background, reporting progress to the mode bar"""
+        conn = self.maintenance_conn
+        start = time.monotonic()
+        progress = {"steps": 0, "shown": start}
+
+        def on_progress() -> int:
+            progress["steps"] += 1
+            now = time.monotonic()
+            if now - progress["shown"] >= 0.25:
+                progress["shown"] = now
+                self.call_from_thread(
+                    self._show_maintenance_progress,
+                    f"{label} running... {now - start:.1f}s, {progress['steps']}k steps (press 'c' to cancel)"
+                )
+            return 0
+
+        # Called every 1000 SQLite VM instructions
+        conn.set_progress_handler(on_progress, 1000)
+        try:
+            conn.execute(sql, params)
+            conn.commit()
+            message = f"✓ {label} finished in {time.monotonic() - start:.1f}s"
+            if params:
+                message += f"\nWrote {params[0]}"
+            self.call_from_thread(self.notify, message, severity="information")
+        except sqlite3.Error as e:
+            if isinstance(e, sqlite3.OperationalError) and "interrupted" in str(e):
+                self.call_from_thread(self.notify, f"✗ {label} cancelled", severity="warning")
+            else:
+                self.call_from_thread(self.notify, f"{label} failed: {str(e)}", severity="error")
+        finally:
+            # Clear before closing so cancel never sees a closed connection
+            self.maintenance_conn = None
+            conn.set_progress_handler(None, 0)
+            conn.close()
+            self.call_from_thread(self._finish_maintenance)
+
+    def _show_maintenance_progress(self, text: str) -> None:
+        """Update the mode bar, called on the UI thread via call_from_thread"""
+        self.query_one("#generated-sql", Static).update(text)
+
+    def _finish_maintenance(self) -> None:
+        """Refresh table list and storage report after maintenance"""
+        self.query_one("#generated-sql", Static).update("")
+        try:
+            self.tables_names = get_table_names(self.db_conn)
+        except sqlite3.OperationalError as e:
+            self.notify(f"Could not refresh tables: {str(e)}", severity="error")
+        if self.view_state == "storage":
+            self.action_storage()
+        else:
+            self._hide_loading()
+
     def action_confirm_commit(self) -> None:
         """Confirm and commit pending changes (y key)"""
         if self.pending_commit:
@@ -276,6 +530,9 @@ class DatabaseUI(App):
         """Handle row selection in the DataTable"""
         if self.view_state == "table_list":
             # Viewing table list: select a table to view its data
+            if self.maintenance_conn:
+                self.notify("Wait for the maintenance task to finish", severity="warning")
+                return
             table = event.data_table
             row_index = event.cursor_row
             row = table.get_row_at(row_index)
@@ -286,23 +543,26 @@ class DatabaseUI(App):
             # Viewing table data: show selected row details as JSON
             self.show_row_details(event)
 
+        elif self.view_state == "storage":
+            # Viewing storage report: show raw stats for the table or index
+            stats = self.storage_objects[event.cursor_row]
+            welcome = self.query_one("#welcome-box", Static)
+            welcome.add_class("left-align")
+            welcome.update(Text(f"Storage Details:\n\n{json.dumps(stats, indent=2)}"))
+
     def execute_sql_query(self, sql_query: str, original_text: str = None, auto_commit: bool = True) -> int:
         """Execute SQL query and display results. Returns rowcount for modification queries."""
         try:
-            cursor = self.db_conn.execute(sql_query)
+            columns, rows, rowcount = execute_query(self.db_conn, sql_query)
 
-            # Check if it's a SELECT query (has description) or modification query (no description)
-            if cursor.description:
+            # Check if it's a SELECT query (has columns) or modification query (no columns)
+            if columns is not None:
                 # SELECT query - show results
-                rows = cursor.fetchall()
-                columns = [description[0] for description in cursor.description]
                 self.display_sql_results(columns, rows, original_text or sql_query)
                 self.notify(f"Query returned {len(rows)} rows", severity="information")
                 return 0
             else:
                 # UPDATE/DELETE/INSERT query - show affected rows
-                rowcount = cursor.rowcount
-
                 if auto_commit:
                     welcome = self.query_one("#welcome-box", Static)
                     welcome.add_class("left-align")
@@ -390,11 +650,25 @@ class DatabaseUI(App):
                 self.query_one("#loading", LoadingIndicator).display = False
 
 
+def _format_bytes(size: float) -> str:
+    """Format a byte count for display, e.g. 1536 -> '1.5 KB'"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: uv run app.py <database.db>")
+        print("Usage: uv run app.py <database.db> [--batch questions.txt | --sql file.sql]")
         sys.exit(1)
 
+    # The TUI takes no options, so any option (--sql, --batch=..., --help) is batch mode
+    if any(arg.startswith("-") for arg in sys.argv[1:]):
+        from batch import main as batch_main
+        sys.exit(batch_main(sys.argv[1:]))
+
     app = DatabaseUI()
     app.run()
 
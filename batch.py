@@ -0,0 +1,238 @@
+import argparse
+import json
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from database_conn import open_connection, execute_query, is_read_only_query, strip_leading_comments, get_database_schema
+
+
+def _json_default(value):
+    """Encode values json cannot handle, BLOBs become hex strings"""
+    if isinstance(value, bytes):
+        return value.hex()
+    return str(value)
+
+def read_questions(path: str) -> list:
+    """Returns one question per non-empty line, skipping '#' comments"""
+    with open(path) as f:
+        lines = [line.strip() for line in f]
+    return [line for line in lines if line and not line.startswith('#')]
+
+def read_sql_statements(path: str) -> list:
+    """Split a SQL file into complete statements, dropping comment-only chunks"""
+    with open(path) as f:
+        script = f.read()
+
+    chunks = []
+    start = 0
+    for end, char in enumerate(script):
+        # A ';' only ends a statement when it is not inside a string or comment
+        if char == ';' and sqlite3.complete_statement(script[start:end + 1]):
+            chunks.append(script[start:end + 1])
+            start = end + 1
+    chunks.append(script[start:])
+
+    statements = []
+    for chunk in chunks:
+        if strip_leading_comments(chunk).rstrip(';').strip():
+            statements.append(chunk.strip())
+
+    return statements
+
+
+class BatchRunner():
+    """Runs statements or questions without the TUI and streams results as JSONL
+
+    Read-only statements run concurrently on per-thread read-only connections.
+    Anything else runs on the single writer connection, after all earlier reads
+    have finished, so results match running the batch in order. The writer is
+    in autocommit mode, so BEGIN/COMMIT/ROLLBACK in a SQL file behave as they
+    would in the sqlite3 shell, and reads inside such a transaction go to the
+    writer so they see its uncommitted changes. Once a PRAGMA, ATTACH or DETACH
+    has changed the writer's connection state, every later read uses the
+    writer too, since fresh readers would not share that state.
+    """
+
+    def __init__(self, db_path: str, workers: int = 4, commit_ai_changes: bool = False):
+        self.db_path = db_path
+        self.out = None
+        self.workers = workers
+        self.commit_ai_changes = commit_ai_changes
+        self.writer = open_connection(db_path)
+        self.writer.isolation_level = None
+        self._local = threading.local()
+        self._readers = []
+        self._lock = threading.Lock()
+        self.stats = {"statements": 0, "errors": 0}
+        self.reads_on_writer = False
+
+    def _reader(self):
+        """Return the read-only connection owned by the calling thread"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = open_connection(self.db_path, read_only=True, check_same_thread=False)
+            self._local.conn = conn
+            with self._lock:
+                self._readers.append(conn)
+        return conn
+
+    def _emit(self, record: dict) -> None:
+        """Write one JSONL record, keeping lines from concurrent threads intact"""
+        line = json.dumps(record, default=_json_default)
+        with self._lock:
+            self.stats["statements"] += 1
+            if record["status"] == "error":
+                self.stats["errors"] += 1
+            self.out.write(line + "\n")
+            self.out.flush()
+
+    def _run(self, conn, index: int, text: str, sql: str, ai_generated: bool) -> None:
+        """Execute one statement and emit its result"""
+        record = {"index": index, "input": text, "sql": sql, "status": "ok"}
+        start = time.perf_counter()
+
+        # Mirror the TUI: AI-generated changes need explicit confirmation, so
+        # they run inside a transaction that is rolled back afterwards
+        dry_run = ai_generated and not self.commit_ai_changes and conn is self.writer
+        try:
+            if dry_run:
+                conn.execute("BEGIN")
+            columns, rows, rowcount = execute_query(conn, sql)
+            if columns is not None:
+                record["columns"] = columns
+                record["rows"] = [list(row) for row in rows]
+            else:
+                record["rowcount"] = rowcount
+            if dry_run and conn.in_transaction:
+                conn.rollback()
+                if columns is None:
+                    record["status"] = "rolled_back"
+        except Exception as e:
+            if dry_run and conn.in_transaction:
+                conn.rollback()
+            record["status"] = "error"
+            record["error"] = str(e)
+        record["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        self._emit(record)
+
+    def _run_read(self, index: int, text: str, sql: str, ai_generated: bool) -> None:
+        self._run(self._reader(), index, text, sql, ai_generated)
+
+    def _can_use_reader(self, sql: str) -> bool:
+        """Returns True if sql can run on a read-only connection with the same result"""
+        # Reads inside an open transaction must see its changes
+        if self.reads_on_writer or self.writer.in_transaction:
+            return False
+        return is_read_only_query(self.writer, sql)
+
+    def close(self) -> None:
+        for conn in self._readers:
+            conn.close()
+        self.writer.close()
+
+    def run(self, items: list, out, bedrock=None) -> dict:
+        """Run SQL statements, or questions when a Bedrock client is given"""
+        self.out = out
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as llm_pool, \
+                ThreadPoolExecutor(max_workers=self.workers) as read_pool:
+            if bedrock:
+                schema = get_database_schema(self.writer)
+                sql_futures = [llm_pool.submit(bedrock.get_sql, item, schema) for item in items]
+
+            pending_reads = []
+            for index, text in enumerate(items):
+                sql = text
+                if bedrock:
+                    try:
+                        sql = sql_futures[index].result()
+                    except Exception as e:
+                        self._emit({"index": index, "input": text, "status": "error", "error": str(e)})
+                        continue
+
+                    if sql == "NO_QUERY_NEEDED":
+                        self._emit({"index": index, "input": text, "status": "skipped"})
+                        continue
+
+                if self._can_use_reader(sql):
+                    pending_reads.append(read_pool.submit(self._run_read, index, text, sql, bedrock is not None))
+                else:
+                    # Writes act as a barrier so reads never overlap a write
+                    wait(pending_reads)
+                    pending_reads = []
+                    self._run(self.writer, index, text, sql, bedrock is not None)
+                    if strip_leading_comments(sql).upper().startswith(('PRAGMA', 'ATTACH', 'DETACH')):
+                        self.reads_on_writer = True
+
+            wait(pending_reads)
+
+        self.close()
+
+        elapsed = time.perf_counter() - start
+        summary = dict(self.stats, elapsed_s=round(elapsed, 3))
+        summary["per_second"] = round(summary["statements"] / elapsed, 2) if elapsed else 0
+        return summary
+
+
+def main(argv: list) -> int:
+    parser = argparse.ArgumentParser(prog="app.py", description="Run SQL statements or AI questions without the TUI")
+    parser.add_argument("database", help="absolute path to a .db file")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--batch", metavar="FILE", help="file with one natural language question per line")
+    source.add_argument("--sql", metavar="FILE", help="file with SQL statements separated by ';'")
+    parser.add_argument("--output", metavar="FILE", help="write JSONL results to FILE instead of stdout")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent AI requests and reader connections (default: 4)")
+    parser.add_argument("--commit", action="store_true", help="commit data changes generated by AI (rolled back by default)")
+    args = parser.parse_args(argv)
+
+    # stdout may be the JSONL stream, so errors only ever go to stderr.
+    # Everything that can fail runs before --output is opened and truncated.
+    bedrock = None
+    try:
+        if args.batch:
+            items = read_questions(args.batch)
+        else:
+            items = read_sql_statements(args.sql)
+        runner = BatchRunner(args.database, workers=max(1, args.workers), commit_ai_changes=args.commit)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if args.batch:
+        try:
+            from bedrock import Bedrock
+            bedrock = Bedrock()
+        except Exception as e:
+            runner.close()
+            print(f"Failed to initialize AI: {e}", file=sys.stderr)
+            return 1
+
+    try:
+        out = open(args.output, "w") if args.output else sys.stdout
+    except OSError as e:
+        runner.close()
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    try:
+        summary = runner.run(items, out, bedrock)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if args.output:
+            out.close()
+
+    print(
+        f"{summary['statements']} statement(s) in {summary['elapsed_s']}s "
+        f"({summary['per_second']}/s), {summary['errors']} error(s)",
+        file=sys.stderr
+    )
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,84 @@
+"""Benchmark opening a table in the TUI
+
+Usage: uv run bench_table_open.py [rows]
+
+Builds a temporary database with one wide table, opens it headlessly and
+reports the time until the grid is idle plus the memory retained by the view,
+both for the first chunk of rows and with every row loaded into the grid.
+"""
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+COLUMNS = 8
+REPEATS = 3
+
+
+def build_database(path: str, rows: int) -> None:
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT, price REAL, qty INTEGER, "
+        "sku TEXT, created TEXT, note TEXT, data BLOB)"
+    )
+    conn.executemany(
+        "INSERT INTO items (name, price, qty, sku, created, note, data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (
+            (f"item {i}", i * 0.25, i % 97, f"SKU-{i:08d}", "2024-01-01 12:00:00", None if i % 3 else "fragile", b"\x00\x01")
+            for i in range(rows)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+async def open_table(app, pilot, load_all: bool) -> None:
+    app.show_table_data("items")
+    if load_all:
+        app.load_more_rows(all_rows=True)
+    await pilot.pause()
+
+
+async def measure(rows: int) -> None:
+    from app import DatabaseUI
+
+    app = DatabaseUI()
+    async with app.run_test(size=(160, 50)) as pilot:
+        await pilot.pause()
+
+        print(f"rows: {rows}, columns: {COLUMNS}")
+        for label, load_all in (("open table", False), ("open + load all rows", True)):
+            timings = []
+            for _ in range(REPEATS):
+                app.show_table_list()
+                await pilot.pause()
+
+                start = time.perf_counter()
+                await open_table(app, pilot, load_all)
+                timings.append(time.perf_counter() - start)
+
+            # Measured separately since tracing allocations skews the timings
+            app.show_table_list()
+            await pilot.pause()
+            tracemalloc.start()
+            await open_table(app, pilot, load_all)
+            retained, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            print(
+                f"{label}: best {min(timings) * 1000:.1f} ms, worst {max(timings) * 1000:.1f} ms, "
+                f"retained {retained / 1024 / 1024:.1f} MB, peak {peak / 1024 / 1024:.1f} MB"
+            )
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        build_database(db_path, rows)
+        sys.argv = [sys.argv[0], db_path]
+        asyncio.run(measure(rows))
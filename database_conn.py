@@ -1,6 +1,8 @@
 import sqlite3
 import sys
+import re
 import os
+import pathlib
 
 def _validate_file_type(path: str):
     """Validate that path ends in .db and is an absolute file path"""
@@ -11,12 +13,25 @@ def _validate_file_type(path: str):
     if not os.path.isabs(path):
         raise ValueError(f"Path must be absolute, got relative path: {path}")
 
+def open_connection(path: str, read_only: bool = False, check_same_thread: bool = True):
+    """Open a connection to the database at path
+
+    Read-only connections use SQLite's URI syntax so that any statement that
+    tries to write fails instead of taking the write lock.
+    """
+    _validate_file_type(path)
+
+    if read_only:
+        uri = f"{pathlib.Path(path).as_uri()}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=check_same_thread)
+    else:
+        conn = sqlite3.connect(path, check_same_thread=check_same_thread)
+    conn.row_factory = sqlite3.Row
+    return conn
+
 def establish_connection(path: str):
     try:
-        _validate_file_type(sys.argv[1])
-        conn = sqlite3.connect(path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        return open_connection(path)
     except ValueError as e:
         print(f"Validation error: {e}")
     except FileNotFoundError as e:
@@ -41,23 +56,82 @@ def get_table_names(conn) -> list:
     return table_info
 
 def get_table_data(conn, table_name: str) -> tuple:
-    """Returns columns and rows for a specific table
+    """Returns columns and column-oriented values for a specific table
 
     Returns:
-        tuple: (column_names, rows) where column_names is a list of strings
-               and rows is a list of tuples
+        tuple: (column_names, column_values) where column_names is a list of
+               strings and column_values holds one list of typed values per
+               column, so the value at row i of column j is column_values[j][i]
     """
     cursor = conn.cursor()
+    # Plain tuples are much lighter than sqlite3.Row for large tables
+    cursor.row_factory = None
 
-    # Get column names
-    cursor.execute(f"PRAGMA table_info({table_name})")
-    columns = [col[1] for col in cursor.fetchall()]
-
-    # Get all rows
     cursor.execute(f"SELECT * FROM {table_name}")
-    rows = cursor.fetchall()
+    columns = [description[0] for description in cursor.description]
+    column_values = [[] for _ in columns]
+
+    # Fill the columns in batches so all rows never exist as tuples at once
+    while batch := cursor.fetchmany(1000):
+        for values, column in zip(column_values, zip(*batch)):
+            values.extend(column)
+
+    return columns, column_values
+
+
+def strip_leading_comments(sql: str) -> str:
+    """Returns sql without leading whitespace and -- or /* */ comments"""
+    sql = sql.lstrip()
+    while sql.startswith(('--', '/*')):
+        if sql.startswith('--'):
+            end = sql.find('\n')
+            sql = sql[end + 1:].lstrip() if end != -1 else ""
+        else:
+            end = sql.find('*/')
+            sql = sql[end + 2:].lstrip() if end != -1 else ""
+    return sql
+
+def is_read_only_query(conn, sql: str) -> bool:
+    """Returns True if the statement only reads from the database
+
+    The statement is compiled with EXPLAIN on conn (not executed) and counts
+    as a read when it returns rows and none of its Transaction opcodes ask
+    for a write transaction, the same test as sqlite3_stmt_readonly. Reads
+    that touch the temp schema or an attached database (a Transaction P1 or
+    OpenRead P3 other than 0, the main database) also return False, since
+    only conn can see them.
+    """
+    if not strip_leading_comments(sql).upper().startswith(('SELECT', 'WITH', 'EXPLAIN', 'VALUES')):
+        return False
+
+    try:
+        program = conn.execute(f"EXPLAIN {sql}").fetchall()
+    except sqlite3.Error:
+        return False
+
+    opcodes = [(row[1], row[2], row[3], row[4]) for row in program]
+    returns_rows = any(opcode == 'ResultRow' for opcode, _, _, _ in opcodes)
+    writes = any(opcode == 'Transaction' and p2 != 0 for opcode, _, p2, _ in opcodes)
+    other_schema = any(
+        (opcode == 'Transaction' and p1 != 0) or (opcode == 'OpenRead' and p3 != 0)
+        for opcode, p1, _, p3 in opcodes
+    )
+    return returns_rows and not writes and not other_schema
+
+def execute_query(conn, sql: str) -> tuple:
+    """Execute a single SQL statement without committing
 
-    return columns, rows
+    Returns:
+        tuple: (column_names, rows, rowcount) where column_names is None and
+               rows is empty for statements that do not return rows
+    """
+    cursor = conn.execute(sql)
+
+    if cursor.description:
+        columns = [description[0] for description in cursor.description]
+        return columns, cursor.fetchall(), 0
+
+    return None, [], cursor.rowcount
 
 
 def get_database_schema(conn):
@@ -72,3 +146,79 @@ def get_database_schema(conn):
 
     return schema_text
 
+
+def get_storage_report(conn) -> tuple:
+    """Returns page level storage statistics built on the dbstat virtual table
+
+    Returns:
+        tuple: (summary, objects) where summary is a dict of database wide
+               page counts and objects is a list of dicts, one per table or
+               index, sorted by size on disk (largest first)
+
+    Raises sqlite3.OperationalError if SQLite was built without dbstat.
+    """
+    cursor = conn.cursor()
+
+    page_size = cursor.execute("PRAGMA page_size").fetchone()[0]
+    page_count = cursor.execute("PRAGMA page_count").fetchone()[0]
+    freelist_count = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+
+    summary = {
+        "page_size": page_size,
+        "page_count": page_count,
+        "freelist_count": freelist_count,
+        "file_size": page_size * page_count,
+        "free_percent": round(100 * freelist_count / page_count, 2) if page_count else 0,
+    }
+
+    cursor.execute("SELECT name, type, tbl_name, sql FROM sqlite_master WHERE type IN ('table', 'index')")
+    kinds = {}
+    for name, kind, tbl_name, create_sql in cursor.fetchall():
+        # WITHOUT ROWID tables are stored as index b-trees, table options
+        # follow the closing parenthesis of the column list
+        options = (create_sql or "")[(create_sql or "").rfind(')') + 1:]
+        index_btree = kind == "index" or re.search(r"\bWITHOUT\s+ROWID\b", options, re.IGNORECASE) is not None
+        kinds[name] = (kind, tbl_name, index_btree)
+
+    # dbstat yields pages in b-tree traversal order, so a page that does not
+    # directly follow the previous page of the same object is out of sequence
+    objects = {}
+    cursor.execute("SELECT name, pageno, pagetype, ncell, payload, unused, pgsize FROM dbstat")
+    for name, pageno, pagetype, ncell, payload, unused, pgsize in cursor:
+        stats = objects.get(name)
+        if stats is None:
+            kind, tbl_name, index_btree = kinds.get(name, ("table", name, False))
+            stats = objects[name] = {
+                "name": name, "type": kind, "table": tbl_name,
+                "size": 0, "pages": 0, "overflow_pages": 0, "rows": 0,
+                "payload": 0, "unused": 0, "_gaps": 0, "_last_page": None,
+                "_index_btree": index_btree,
+            }
+
+        stats["size"] += pgsize
+        stats["pages"] += 1
+        stats["payload"] += payload
+        stats["unused"] += unused
+        if pagetype == "overflow":
+            stats["overflow_pages"] += 1
+        elif pagetype == "leaf" or stats["_index_btree"]:
+            # Index b-tree entries (indexes and WITHOUT ROWID tables) live in
+            # interior cells too, rowid table rows only in leaves
+            stats["rows"] += ncell
+
+        if stats["_last_page"] is not None and pageno != stats["_last_page"] + 1:
+            stats["_gaps"] += 1
+        stats["_last_page"] = pageno
+
+    report = []
+    for stats in objects.values():
+        gaps = stats.pop("_gaps")
+        stats.pop("_last_page")
+        stats.pop("_index_btree")
+        stats["avg_payload"] = round(stats["payload"] / stats["rows"], 1) if stats["rows"] else 0
+        stats["unused_percent"] = round(100 * stats["unused"] / stats["size"], 2) if stats["size"] else 0
+        stats["fragmentation_percent"] = round(100 * gaps / (stats["pages"] - 1), 2) if stats["pages"] > 1 else 0
+        report.append(stats)
+
+    report.sort(key=lambda stats: stats["size"], reverse=True)
+    return summary, report
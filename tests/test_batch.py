@@ -0,0 +1,59 @@
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from batch import BatchRunner, read_sql_statements
+
+
+class BatchRunnerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "t.db")
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE a (id INTEGER PRIMARY KEY, data BLOB)")
+        conn.executemany("INSERT INTO a (data) VALUES (?)", [(b"\x00\xff",), (None,)])
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_sql(self, script: str) -> list:
+        """Run script through BatchRunner and return its records in input order"""
+        sql_path = os.path.join(self.tmp.name, "q.sql")
+        with open(sql_path, "w") as f:
+            f.write(script)
+
+        out = io.StringIO()
+        BatchRunner(self.db_path, workers=2).run(read_sql_statements(sql_path), out)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        return sorted(records, key=lambda record: record["index"])
+
+    def test_reads_see_temp_tables(self):
+        records = self.run_sql(
+            "CREATE TEMP TABLE scratch AS SELECT 1 AS v;\n"
+            "SELECT * FROM scratch;\n"
+        )
+        self.assertEqual([record["status"] for record in records], ["ok", "ok"])
+        self.assertEqual(records[1]["rows"], [[1]])
+
+    def test_reads_see_attached_databases(self):
+        records = self.run_sql(
+            f"ATTACH '{self.db_path}' AS other;\n"
+            "SELECT count(*) FROM other.a;\n"
+            "SELECT count(*) FROM a;\n"
+        )
+        self.assertEqual([record["status"] for record in records], ["ok", "ok", "ok"])
+        self.assertEqual(records[1]["rows"], [[2]])
+
+    def test_blobs_are_hex_encoded(self):
+        records = self.run_sql("SELECT data FROM a ORDER BY id;")
+        self.assertEqual(records[0]["rows"], [["00ff"], [None]])
+
+
+if __name__ == "__main__":
+    unittest.main()